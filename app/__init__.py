@@ -6,10 +6,18 @@ import atexit
 from config import Config
 
 
-def create_app():
-    """Create and configure the Flask application."""
+def create_app(config_overrides=None):
+    """
+    Create and configure the Flask application.
+    
+    Args:
+        config_overrides: Optional dict of settings applied on top of Config
+            before extensions are initialized (e.g. engine options for tests)
+    """
     app = Flask(__name__)
     app.config.from_object(Config)
+    if config_overrides:
+        app.config.update(config_overrides)
 
     # Initialize extensions
     from app.extensions import db
@@ -5,7 +5,11 @@ This module provides reusable fixtures for testing the Freakinbeats application,
 including Flask app context, database setup, and mock Discogs API utilities.
 """
 
+import itertools
 import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import StaticPool
 from app import create_app
 from app.extensions import db as _db
 from tests.fixtures.discogs_factory import DiscogsDataFactory
@@ -27,19 +31,83 @@ def app():
     os.environ['DISCOGS_TOKEN'] = 'test_token_12345'
     os.environ['DISCOGS_SELLER_USERNAME'] = 'test_seller'
     
-    app = create_app()
+    # Config reads DATABASE_URL at import time, so the in-memory database
+    # has to be passed to create_app() before the engine is built
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        # Production pool options are left out on purpose: pool_recycle would
+        # reopen the StaticPool connection (and lose the in-memory schema) and
+        # pool_pre_ping adds a SELECT 1 to every connect
+        'SQLALCHEMY_ENGINE_OPTIONS': {
+            # One shared connection keeps the in-memory database alive
+            'poolclass': StaticPool,
+            'connect_args': {'check_same_thread': False},
+            # Keep compiled statements cached across the whole run
+            'query_cache_size': 1200,
+        }
+    })
     app.config.update({
         'TESTING': True,
-        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
         'ENABLE_AUTO_SYNC': False,  # Disable scheduler in tests
         'DISCOGS_TOKEN': 'test_token_12345',
         'DISCOGS_SELLER_USERNAME': 'test_seller',
         'DISCOGS_USER_AGENT': 'FreakinBeatsTest/1.0'
     })
+
+    with app.app_context():
+        engine = _db.engine
+        _enable_sqlite_savepoints(engine)
+        _disable_sqlite_durability(engine)
+        # Reconnect so pooled connections pick up the connect listeners
+        engine.dispose()
     
     yield app
 
 
+def _enable_sqlite_savepoints(engine):
+    """
+    Let pysqlite nest SAVEPOINTs inside a real transaction.
+
+    pysqlite never emits BEGIN itself before a SAVEPOINT, so releasing the
+    outermost SAVEPOINT would commit. Turning off the driver's transaction
+    handling and emitting BEGIN from SQLAlchemy keeps the ``db`` fixture's
+    outer transaction in charge.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, 'begin')
+    def _emit_begin(connection):
+        connection.exec_driver_sql('BEGIN')
+
+
+def _disable_sqlite_durability(engine):
+    """
+    Skip SQLite durability work the test database never needs.
+
+    Nothing outlives the test run, so journaling and syncing on every
+    commit is wasted effort.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in (
+            'synchronous=OFF',
+            'journal_mode=MEMORY',
+            'temp_store=MEMORY',
+            'locking_mode=EXCLUSIVE',
+        ):
+            cursor.execute(f'PRAGMA {pragma}')
+        cursor.close()
+
+
 @pytest.fixture(scope='function')
 def app_context(app):
     """
@@ -51,18 +119,60 @@ def app_context(app):
         yield app
 
 
+@pytest.fixture(scope='session')
+def engine(app):
+    """
+    Provide the SQLAlchemy engine bound to the test application.
+
+    Fails fast if the dialect opts out of SQLAlchemy's compiled statement
+    cache, since every test INSERT would then be recompiled.
+    """
+    with app.app_context():
+        engine = _db.engine
+        assert engine.dialect.supports_statement_cache is True
+        yield engine
+
+
+@pytest.fixture(scope='session')
+def tables(app, engine):
+    """
+    Create the schema once for the whole test session.
+
+    Tables are created before the first test that needs them and dropped
+    after the last one. Yields the model metadata.
+    """
+    with app.app_context():
+        _db.create_all()
+        yield _db.metadata
+        _db.drop_all()
+
+
 @pytest.fixture(scope='function')
-def db(app_context):
+def db(app_context, engine, tables):
     """
     Provide a clean database for each test.
-    
-    This fixture creates all tables before the test and drops them after.
-    Each test gets a fresh database state.
+
+    This fixture runs each test inside an outer transaction that is rolled
+    back afterwards. ``db.session`` is swapped for a session joined to that
+    transaction with ``join_transaction_mode='create_savepoint'``, so
+    ``commit()`` and ``rollback()`` inside a test only release or roll back
+    a SAVEPOINT. Each test gets a fresh database state without recreating
+    the schema.
     """
-    _db.create_all()
+    connection = engine.connect()
+    transaction = connection.begin()
+    original_session = _db.session
+    _db.session = scoped_session(sessionmaker(
+        bind=connection,
+        join_transaction_mode='create_savepoint'
+    ))
+
     yield _db
+
     _db.session.remove()
-    _db.drop_all()
+    _db.session = original_session
+    transaction.rollback()
+    connection.close()
 
 
 @pytest.fixture(scope='function')
@@ -77,6 +187,21 @@ def session(db):
     db.session.rollback()
 
 
+@pytest.fixture(scope='session')
+def make_uuid():
+    """
+    Provide a factory for deterministic, UUID-shaped primary keys.
+    
+    Passing these explicitly skips the uuid4() column default for tests
+    that don't care about UUID format or randomness.
+    
+    Returns:
+        Callable[[], str]: Returns a new unique UUID string on each call
+    """
+    counter = itertools.count(1)
+    return lambda: f'00000000-0000-0000-0000-{next(counter):012d}'
+
+
 @pytest.fixture
 def discogs_factory():
     """
@@ -13,25 +13,32 @@ Tests cover:
 """
 
 import pytest
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from app.models.listing import Listing
 from app.extensions import db
 import uuid
 
 
+# Fixed timestamp for tests that only need a valid datetime
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
 class TestListingModel:
     """Test suite for Listing model basic functionality."""
     
-    def test_listing_creation_with_minimal_fields(self, db):
+    def test_listing_creation_with_minimal_fields(self, db, make_uuid):
         """Test creating a listing with only required fields."""
         listing = Listing(
+            uuid=make_uuid(),
             listing_id='test-listing-001',
             price_value=29.99,
             release_id='release-123'
         )
         
         db.session.add(listing)
-        db.session.commit()
+        db.session.flush()
         
         assert listing.uuid is not None
         assert listing.listing_id == 'test-listing-001'
@@ -39,16 +46,15 @@ class TestListingModel:
         assert listing.release_id == 'release-123'
         assert listing.is_active is True  # Default value
     
-    def test_listing_creation_with_all_fields(self, db):
+    def test_listing_creation_with_all_fields(self, db, make_uuid):
         """Test creating a listing with all fields populated."""
-        now = datetime.now(timezone.utc)
-        
         listing = Listing(
+            uuid=make_uuid(),
             listing_id='test-listing-002',
             status='For Sale',
             condition='Very Good Plus (VG+)',
             sleeve_condition='Very Good (VG)',
-            posted=now,
+            posted=NOW,
             uri='/marketplace/listing/12345',
             resource_url='https://api.discogs.com/marketplace/listings/12345',
             price_value=49.99,
@@ -82,13 +88,13 @@ class TestListingModel:
             image_resource_url='https://api.discogs.com/image/123',
             release_community_have=50000,
             release_community_want=10000,
-            export_timestamp=now,
+            export_timestamp=NOW,
             is_active=True,
             custom_metadata={'featured': True, 'condition_notes': 'Excellent'}
         )
         
         db.session.add(listing)
-        db.session.commit()
+        db.session.flush()
         
         # Verify all fields
         assert listing.uuid is not None
@@ -106,18 +112,19 @@ class TestListingUUID:
     
     def test_uuid_auto_generation(self, db):
         """Test that UUID is automatically generated when not provided."""
-        listing = Listing(
-            listing_id='test-uuid-001',
-            price_value=19.99,
-            release_id='release-001'
-        )
-        
-        db.session.add(listing)
-        db.session.commit()
-        
-        assert listing.uuid is not None
-        assert len(listing.uuid) == 36  # Standard UUID format
-        assert listing.uuid.count('-') == 4  # UUID has 4 hyphens
+        # INSERT ... RETURNING hands back the generated key in one statement
+        listing_uuid = db.session.execute(
+            insert(Listing).returning(Listing.uuid),
+            {
+                'listing_id': 'test-uuid-001',
+                'price_value': 19.99,
+                'release_id': 'release-001'
+            }
+        ).scalar_one()
+        
+        assert listing_uuid is not None
+        assert len(listing_uuid) == 36  # Standard UUID format
+        assert listing_uuid.count('-') == 4  # UUID has 4 hyphens
     
     def test_uuid_uniqueness(self, db):
         """Test that each listing gets a unique UUID."""
@@ -134,343 +141,256 @@ class TestListingUUID:
         
         db.session.add(listing1)
         db.session.add(listing2)
-        db.session.commit()
+        db.session.flush()
         
         assert listing1.uuid != listing2.uuid
     
-    def test_uuid_format_validation(self, db):
+    def test_uuid_format_validation(self, sample_listing):
         """Test that generated UUID follows proper format."""
-        listing = Listing(
-            listing_id='test-uuid-004',
-            price_value=19.99,
-            release_id='release-004'
-        )
+        # Raises ValueError if the value is not a valid UUID
+        parsed = uuid.UUID(sample_listing.uuid)
         
-        db.session.add(listing)
-        db.session.commit()
-        
-        # Validate UUID format (8-4-4-4-12 hex characters)
-        uuid_parts = listing.uuid.split('-')
-        assert len(uuid_parts) == 5
-        assert len(uuid_parts[0]) == 8
-        assert len(uuid_parts[1]) == 4
-        assert len(uuid_parts[2]) == 4
-        assert len(uuid_parts[3]) == 4
-        assert len(uuid_parts[4]) == 12
-        
-        # Verify all characters are valid hex
-        assert all(c in '0123456789abcdef-' for c in listing.uuid.lower())
+        # Stored in canonical 8-4-4-4-12 lowercase hex form
+        assert str(parsed) == sample_listing.uuid
     
-    def test_uuid_persistence_after_retrieval(self, db):
-        """Test that UUID remains consistent after database retrieval."""
-        listing = Listing(
-            listing_id='test-uuid-005',
-            price_value=19.99,
-            release_id='release-005'
-        )
-        
-        db.session.add(listing)
-        db.session.commit()
+    def test_uuid_persistence_after_retrieval(self, sample_listing):
+        """Test that UUID remains consistent when the listing is looked up again."""
+        original_uuid = sample_listing.uuid
         
-        original_uuid = listing.uuid
-        listing_id = listing.listing_id
-        
-        # Clear session and retrieve again
-        db.session.expunge(listing)
-        retrieved_listing = Listing.query.filter_by(listing_id=listing_id).first()
+        # Served from the identity map, no SELECT needed
+        retrieved_listing = Listing.query.get(original_uuid)
         
+        assert retrieved_listing is sample_listing
         assert retrieved_listing.uuid == original_uuid
     
-    def test_uuid_as_primary_key_query(self, db):
+    def test_uuid_as_primary_key_query(self, db, sample_listing):
         """Test querying listings by UUID primary key."""
-        listing = Listing(
-            listing_id='test-uuid-006',
-            price_value=19.99,
-            release_id='release-006'
-        )
+        listing_uuid = sample_listing.uuid
         
-        db.session.add(listing)
-        db.session.commit()
-        
-        # Query by UUID
-        found_listing = Listing.query.get(listing.uuid)
+        # Expunge so the lookup goes to the database, not the identity map
+        db.session.expunge(sample_listing)
+        found_listing = Listing.query.get(listing_uuid)
         
         assert found_listing is not None
-        assert found_listing.listing_id == 'test-uuid-006'
-        assert found_listing.uuid == listing.uuid
+        assert found_listing is not sample_listing
+        assert found_listing.listing_id == 'test-sample-001'
+        assert found_listing.uuid == listing_uuid
 
 
 class TestListingConstraints:
     """Test suite for model constraints and validations."""
     
-    def test_listing_id_uniqueness(self, db):
+    def test_listing_id_uniqueness(self, db, sample_listing, make_uuid):
         """Test that listing_id must be unique."""
-        listing1 = Listing(
-            listing_id='duplicate-id',
-            price_value=19.99,
-            release_id='release-001'
-        )
-        listing2 = Listing(
-            listing_id='duplicate-id',
+        duplicate = Listing(
+            uuid=make_uuid(),
+            listing_id=sample_listing.listing_id,
             price_value=29.99,
             release_id='release-002'
         )
         
-        db.session.add(listing1)
-        db.session.commit()
+        # Only the SAVEPOINT is rolled back when the insert fails
+        with pytest.raises(IntegrityError):
+            with db.session.begin_nested():
+                db.session.add(duplicate)
         
-        db.session.add(listing2)
-        
-        with pytest.raises(Exception):  # SQLAlchemy IntegrityError
-            db.session.commit()
-        
-        db.session.rollback()
+        assert Listing.query.filter_by(listing_id=sample_listing.listing_id).count() == 1
     
-    def test_price_value_non_negative_constraint(self, db):
+    def test_price_value_non_negative_constraint(self, db, make_uuid):
         """Test that price_value must be non-negative."""
         listing = Listing(
+            uuid=make_uuid(),
             listing_id='test-price-001',
             price_value=-10.0,  # Invalid negative price
             release_id='release-001'
         )
         
-        db.session.add(listing)
-        
-        with pytest.raises(Exception):  # CheckConstraint violation
-            db.session.commit()
-        
-        db.session.rollback()
+        with pytest.raises(IntegrityError):  # CheckConstraint violation
+            with db.session.begin_nested():
+                db.session.add(listing)
     
-    def test_required_fields_validation(self, db):
+    def test_required_fields_validation(self, db, make_uuid):
         """Test that required fields cannot be None."""
         # Missing listing_id
         listing1 = Listing(
+            uuid=make_uuid(),
             price_value=19.99,
             release_id='release-001'
         )
         
-        db.session.add(listing1)
-        
-        with pytest.raises(Exception):  # IntegrityError for nullable=False
-            db.session.commit()
-        
-        db.session.rollback()
+        with pytest.raises(IntegrityError):  # nullable=False violation
+            with db.session.begin_nested():
+                db.session.add(listing1)
 
 
 class TestListingSoftDelete:
     """Test suite for soft delete functionality."""
     
-    def test_default_is_active_true(self, db):
-        """Test that new listings default to is_active=True."""
-        listing = Listing(
-            listing_id='test-active-001',
-            price_value=19.99,
-            release_id='release-001'
-        )
-        
-        db.session.add(listing)
-        db.session.commit()
-        
-        assert listing.is_active is True
-        assert listing.removed_at is None
-        assert listing.sold_at is None
-    
-    def test_soft_delete_removal(self, db):
-        """Test marking a listing as removed (soft delete)."""
-        listing = Listing(
+    def test_soft_delete_lifecycle(self, db, make_uuid):
+        """Test defaults, marking sold and removed, and filtering active listings."""
+        removed_listing = Listing(
+            uuid=make_uuid(),
             listing_id='test-remove-001',
             price_value=19.99,
             release_id='release-001'
         )
-        
-        db.session.add(listing)
-        db.session.commit()
-        
-        # Mark as removed
-        listing.is_active = False
-        listing.removed_at = datetime.now(timezone.utc)
-        db.session.commit()
-        
-        assert listing.is_active is False
-        assert listing.removed_at is not None
-        assert listing.sold_at is None
-    
-    def test_soft_delete_sold(self, db):
-        """Test marking a listing as sold."""
-        listing = Listing(
+        sold_listing = Listing(
+            uuid=make_uuid(),
             listing_id='test-sold-001',
-            price_value=19.99,
-            release_id='release-001'
+            price_value=29.99,
+            release_id='release-002'
         )
         
-        db.session.add(listing)
-        db.session.commit()
+        db.session.add_all([removed_listing, sold_listing])
+        db.session.flush()
+        
+        # New listings default to active
+        for listing in (removed_listing, sold_listing):
+            assert listing.is_active is True
+            assert listing.removed_at is None
+            assert listing.sold_at is None
         
         # Mark as sold
-        listing.is_active = False
-        listing.sold_at = datetime.now(timezone.utc)
-        db.session.commit()
+        sold_listing.is_active = False
+        sold_listing.sold_at = datetime.now(timezone.utc)
+        db.session.flush()
         
-        assert listing.is_active is False
-        assert listing.sold_at is not None
-    
-    def test_query_active_listings_only(self, db):
-        """Test filtering to show only active listings."""
-        # Create active listing
-        active_listing = Listing(
-            listing_id='test-active-002',
-            price_value=19.99,
-            release_id='release-002'
-        )
+        assert sold_listing.is_active is False
+        assert sold_listing.sold_at is not None
         
-        # Create removed listing
-        removed_listing = Listing(
-            listing_id='test-removed-002',
-            price_value=29.99,
-            release_id='release-003',
-            is_active=False,
-            removed_at=datetime.now(timezone.utc)
-        )
+        # Query only active listings (EXISTS avoids loading every active row)
+        active_listings = Listing.query.filter_by(is_active=True)
         
-        db.session.add(active_listing)
-        db.session.add(removed_listing)
-        db.session.commit()
+        def is_listed(listing):
+            query = active_listings.filter_by(listing_id=listing.listing_id)
+            return db.session.query(query.exists()).scalar()
+        
+        assert is_listed(removed_listing)
+        assert not is_listed(sold_listing)
         
-        # Query only active listings
-        active_listings = Listing.query.filter_by(is_active=True).all()
+        # Mark as removed (soft delete)
+        removed_listing.is_active = False
+        removed_listing.removed_at = datetime.now(timezone.utc)
+        db.session.flush()
         
-        assert len(active_listings) >= 1
-        assert all(listing.is_active for listing in active_listings)
-        assert active_listing in active_listings
-        assert removed_listing not in active_listings
+        assert removed_listing.is_active is False
+        assert removed_listing.removed_at is not None
+        assert removed_listing.sold_at is None
+        assert not is_listed(removed_listing)
 
 
 class TestListingTimestamps:
     """Test suite for timestamp fields."""
     
-    def test_created_at_auto_set(self, db):
+    def test_created_at_auto_set(self, db, make_uuid):
         """Test that created_at is automatically set on creation."""
         listing = Listing(
+            uuid=make_uuid(),
             listing_id='test-timestamp-001',
             price_value=19.99,
             release_id='release-001'
         )
         
         db.session.add(listing)
-        db.session.commit()
+        db.session.flush()
         
         assert listing.created_at is not None
         # created_at should be set to a datetime object
         assert isinstance(listing.created_at, datetime)
     
-    def test_updated_at_auto_set(self, db):
+    def test_updated_at_auto_set(self, db, make_uuid):
         """Test that updated_at is automatically set on creation."""
         listing = Listing(
+            uuid=make_uuid(),
             listing_id='test-timestamp-002',
             price_value=19.99,
             release_id='release-002'
         )
         
         db.session.add(listing)
-        db.session.commit()
+        db.session.flush()
         
         assert listing.updated_at is not None
         assert isinstance(listing.updated_at, datetime)
         # created_at and updated_at should be very close (within 1 second)
         assert abs((listing.updated_at - listing.created_at).total_seconds()) < 1
     
-    def test_updated_at_changes_on_update(self, db):
+    def test_updated_at_changes_on_update(self, db, make_uuid):
         """Test that updated_at changes when record is updated."""
         listing = Listing(
+            uuid=make_uuid(),
             listing_id='test-timestamp-003',
             price_value=19.99,
             release_id='release-003'
         )
         
         db.session.add(listing)
-        db.session.commit()
+        db.session.flush()
+        
+        # Backdate instead of sleeping to guarantee a timestamp difference
+        listing.updated_at = listing.updated_at - timedelta(seconds=1)
+        db.session.flush()
         
-        original_updated_at = listing.updated_at
+        # SQLite drops tzinfo, so compare against the naive stored value
+        original_updated_at = listing.updated_at.replace(tzinfo=None)
         
         # Update the listing
-        import time
-        time.sleep(0.01)  # Small delay to ensure timestamp difference
         listing.price_value = 29.99
         db.session.commit()
         
-        assert listing.updated_at >= original_updated_at
+        assert listing.updated_at > original_updated_at
 
 
 class TestListingCustomMetadata:
     """Test suite for custom_metadata JSON field."""
     
-    def test_custom_metadata_storage(self, db):
+    FULL_METADATA = {
+        'featured': True,
+        'condition_notes': 'Excellent pressing',
+        'tags': ['rare', 'limited edition'],
+        'internal_notes': 'Store display copy'
+    }
+    
+    def test_custom_metadata_storage(self, db, sample_listing):
         """Test storing custom metadata as JSON."""
-        metadata = {
-            'featured': True,
-            'condition_notes': 'Excellent pressing',
-            'tags': ['rare', 'limited edition'],
-            'internal_notes': 'Store display copy'
-        }
+        sample_listing.custom_metadata = self.FULL_METADATA
+        db.session.flush()
         
-        listing = Listing(
-            listing_id='test-metadata-001',
-            price_value=19.99,
-            release_id='release-001',
-            custom_metadata=metadata
-        )
+        # Re-read from the database so the value round-trips through db.JSON
+        db.session.expire(sample_listing, ['custom_metadata'])
         
-        db.session.add(listing)
-        db.session.commit()
-        
-        assert listing.custom_metadata['featured'] is True
-        assert listing.custom_metadata['tags'] == ['rare', 'limited edition']
+        assert sample_listing.custom_metadata == self.FULL_METADATA
     
-    def test_custom_metadata_nullable(self, db):
-        """Test that custom_metadata can be None."""
-        listing = Listing(
-            listing_id='test-metadata-002',
-            price_value=19.99,
-            release_id='release-002'
-        )
-        
-        db.session.add(listing)
-        db.session.commit()
-        
-        assert listing.custom_metadata is None
+    def test_custom_metadata_nullable(self, sample_listing):
+        """Test that unset custom_metadata is stored as SQL NULL."""
+        assert Listing.query.filter(
+            Listing.custom_metadata.is_(None),
+            Listing.uuid == sample_listing.uuid
+        ).count() == 1
     
-    def test_custom_metadata_update(self, db):
+    def test_custom_metadata_update(self, db, sample_listing):
         """Test updating custom_metadata after creation."""
-        listing = Listing(
-            listing_id='test-metadata-003',
-            price_value=19.99,
-            release_id='release-003',
-            custom_metadata={'status': 'new'}
-        )
-        
-        db.session.add(listing)
-        db.session.commit()
+        sample_listing.custom_metadata = {'status': 'new'}
+        db.session.flush()
         
         # Update metadata - need to reassign to trigger SQLAlchemy change detection
-        updated_metadata = listing.custom_metadata.copy()
-        updated_metadata['status'] = 'featured'
-        updated_metadata['priority'] = 'high'
-        listing.custom_metadata = updated_metadata
-        db.session.commit()
+        sample_listing.custom_metadata = {'status': 'featured', 'priority': 'high'}
+        db.session.flush()
+        
+        # Re-read from the database to prove the reassignment emitted an UPDATE
+        db.session.expire(sample_listing, ['custom_metadata'])
         
-        retrieved_listing = Listing.query.get(listing.uuid)
-        assert retrieved_listing.custom_metadata['status'] == 'featured'
-        assert retrieved_listing.custom_metadata['priority'] == 'high'
+        assert sample_listing.custom_metadata['status'] == 'featured'
+        assert sample_listing.custom_metadata['priority'] == 'high'
 
 
 class TestListingToDictSerialization:
     """Test suite for to_dict() method."""
     
-    def test_to_dict_includes_all_fields(self, db):
+    def test_to_dict_includes_all_fields(self, db, make_uuid):
         """Test that to_dict() includes all model fields."""
-        now = datetime.now(timezone.utc)
-        
         listing = Listing(
+            uuid=make_uuid(),
             listing_id='test-dict-001',
             status='For Sale',
             condition='Mint (M)',
@@ -484,7 +404,7 @@ class TestListingToDictSerialization:
         )
         
         db.session.add(listing)
-        db.session.commit()
+        db.session.flush()
         
         data = listing.to_dict()
         
@@ -497,20 +417,19 @@ class TestListingToDictSerialization:
         assert data['is_active'] is True
         assert data['custom_metadata']['test'] is True
     
-    def test_to_dict_datetime_serialization(self, db):
+    def test_to_dict_datetime_serialization(self, db, make_uuid):
         """Test that datetime fields are serialized to ISO format."""
-        now = datetime.now(timezone.utc)
-        
         listing = Listing(
+            uuid=make_uuid(),
             listing_id='test-dict-002',
             price_value=19.99,
             release_id='release-002',
-            posted=now,
-            export_timestamp=now
+            posted=NOW,
+            export_timestamp=NOW
         )
         
         db.session.add(listing)
-        db.session.commit()
+        db.session.flush()
         
         data = listing.to_dict()
         
@@ -519,48 +438,31 @@ class TestListingToDictSerialization:
         assert isinstance(data['export_timestamp'], str)
         assert isinstance(data['created_at'], str)
     
-    def test_to_dict_null_datetime_handling(self, db):
+    def test_to_dict_null_datetime_handling(self, sample_listing):
         """Test that None datetime fields are serialized as None."""
-        listing = Listing(
-            listing_id='test-dict-003',
-            price_value=19.99,
-            release_id='release-003'
-        )
-        
-        db.session.add(listing)
-        db.session.commit()
-        
-        data = listing.to_dict()
+        data = sample_listing.to_dict()
         
         assert data['posted'] is None
         assert data['removed_at'] is None
         assert data['sold_at'] is None
         assert data['export_timestamp'] is None
     
-    def test_to_dict_uuid_included(self, db):
+    def test_to_dict_uuid_included(self, sample_listing):
         """Test that UUID is included in serialization."""
-        listing = Listing(
-            listing_id='test-dict-004',
-            price_value=19.99,
-            release_id='release-004'
-        )
-        
-        db.session.add(listing)
-        db.session.commit()
-        
-        data = listing.to_dict()
+        data = sample_listing.to_dict()
         
         assert 'uuid' in data
-        assert data['uuid'] == listing.uuid
+        assert data['uuid'] == sample_listing.uuid
         assert len(data['uuid']) == 36
 
 
 class TestListingRepr:
     """Test suite for __repr__ method."""
     
-    def test_repr_format(self, db):
+    def test_repr_format(self, db, make_uuid):
         """Test that __repr__ returns expected format."""
         listing = Listing(
+            uuid=make_uuid(),
             listing_id='test-repr-001',
             price_value=19.99,
             release_id='release-001',
@@ -569,7 +471,7 @@ class TestListingRepr:
         )
         
         db.session.add(listing)
-        db.session.commit()
+        db.session.flush()
         
         repr_str = repr(listing)
         
@@ -577,16 +479,17 @@ class TestListingRepr:
         assert 'Abbey Road' in repr_str
         assert 'The Beatles' in repr_str
     
-    def test_repr_with_none_fields(self, db):
+    def test_repr_with_none_fields(self, db, make_uuid):
         """Test __repr__ when title and artist are None."""
         listing = Listing(
+            uuid=make_uuid(),
             listing_id='test-repr-002',
             price_value=19.99,
             release_id='release-002'
         )
         
         db.session.add(listing)
-        db.session.commit()
+        db.session.flush()
         
         repr_str = repr(listing)
         
@@ -599,37 +502,52 @@ class TestListingIndexes:
     
     def test_listing_id_indexed(self, db):
         """Test that listing_id is indexed for fast lookups."""
-        # Create multiple listings
-        for i in range(10):
-            listing = Listing(
-                listing_id=f'test-index-{i:03d}',
-                price_value=19.99,
-                release_id=f'release-{i:03d}'
-            )
-            db.session.add(listing)
-        
-        db.session.commit()
+        # Create multiple listings in one bulk INSERT
+        rows = [
+            {
+                'listing_id': f'test-index-{i:03d}',
+                'price_value': 19.99,
+                'release_id': f'release-{i:03d}'
+            }
+            for i in range(10)
+        ]
+        db.session.bulk_insert_mappings(Listing, rows)
         
         # Query by listing_id (should use index)
         result = Listing.query.filter_by(listing_id='test-index-005').first()
         
         assert result is not None
         assert result.listing_id == 'test-index-005'
+        assert result.uuid is not None  # Column default still fires
     
     def test_release_id_indexed(self, db):
         """Test that release_id is indexed for fast lookups."""
-        # Create multiple listings with same release_id
-        for i in range(5):
-            listing = Listing(
-                listing_id=f'test-release-{i:03d}',
-                price_value=19.99,
-                release_id='release-shared-001'
-            )
-            db.session.add(listing)
-        
-        db.session.commit()
+        # Create multiple listings with same release_id in one bulk INSERT
+        rows = [
+            {
+                'listing_id': f'test-release-{i:03d}',
+                'price_value': 19.99,
+                'release_id': 'release-shared-001'
+            }
+            for i in range(5)
+        ]
+        db.session.bulk_insert_mappings(Listing, rows)
         
         # Query by release_id (should use index)
         results = Listing.query.filter_by(release_id='release-shared-001').all()
         
         assert len(results) == 5
+
+
+# Fixtures specific to this test module
+@pytest.fixture
+def sample_listing(db):
+    """Create and flush a minimal listing shared by read-only tests."""
+    listing = Listing(
+        listing_id='test-sample-001',
+        price_value=19.99,
+        release_id='release-sample-001'
+    )
+    db.session.add(listing)
+    db.session.flush()
+    return listing